@@ -7,24 +7,21 @@ Version: 1.0.0
 Author: AnarQorp Team
 """
 
+import io
+import atexit
 import os
 import sys
 import subprocess
 import shutil
+import stat
 import json
+import threading
 import urllib.request
 import zipfile
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
-
-try:
-    import tkinter as tk
-    from tkinter import ttk, messagebox, filedialog, scrolledtext
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
-    print("GUI not available, running in console mode")
+from typing import BinaryIO, Dict, Optional, Tuple, Union
 
 # Configuration
 CONFIG = {
@@ -38,6 +35,18 @@ CONFIG = {
     'required_memory_gb': 2
 }
 
+# Buffer size used when streaming archive contents to disk (1 MiB)
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Minimum number of downloaded bytes between progress updates (4 MiB)
+PROGRESS_INTERVAL = 4 * 1024 * 1024
+
+# Largest download kept in memory; bigger or unknown sizes go to a temp file (64 MiB)
+MAX_IN_MEMORY_DOWNLOAD = 64 * 1024 * 1024
+
+# Delay used to batch log messages into a single GUI update (milliseconds)
+GUI_REFRESH_INTERVAL_MS = 50
+
 class AnarQQInstaller:
     def __init__(self):
         self.install_dir = Path.home() / 'anarqq-ecosystem'
@@ -46,20 +55,51 @@ class AnarQQInstaller:
         self.log_file = self.install_dir / 'install.log'
         self.progress_callback = None
         self.log_callback = None
+        self._log_lock = threading.Lock()
+        self._log_fh = None  # Opened lazily by log(), reopened if log_file changes
+        self._log_fh_path = None
+        atexit.register(self.close_log)
+        self._cmd_cache: Dict[str, Tuple[bool, str]] = {}
+        self._cleanup_threads = []  # Background removals of replaced trees
+        
+        # Shared HTTP opener for all downloads
+        self._http = urllib.request.build_opener()
+        self._http.addheaders = [('User-Agent', 'anarqq-installer/1.0'), ('Accept-Encoding', 'identity')]
         
     def log(self, message: str, level: str = 'INFO'):
         """Log a message"""
         log_entry = f"[{level}] {message}"
-        print(log_entry)
         
-        # Write to log file
-        if self.log_file.parent.exists():
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(f"{log_entry}\n")
-        
-        # Call GUI callback if available
-        if self.log_callback:
-            self.log_callback(log_entry)
+        # Repositories may be fetched concurrently, serialize output
+        with self._log_lock:
+            print(log_entry)
+            
+            # Write to log file
+            log_fh = self._open_log()
+            if log_fh:
+                log_fh.write(f"{log_entry}\n")
+            
+            # Call GUI callback if available
+            if self.log_callback:
+                self.log_callback(log_entry)
+    
+    def _open_log(self):
+        """Return the line-buffered log file handle, opening it once the directory exists"""
+        if self._log_fh and self._log_fh_path != self.log_file:
+            self._log_fh.close()
+            self._log_fh = None
+        
+        if not self._log_fh and self.log_file.parent.exists():
+            self._log_fh = open(self.log_file, 'a', encoding='utf-8', buffering=1)
+            self._log_fh_path = self.log_file
+        return self._log_fh
+    
+    def close_log(self):
+        """Close the log file handle, if open"""
+        with self._log_lock:
+            if self._log_fh:
+                self._log_fh.close()
+                self._log_fh = None
     
     def update_progress(self, value: int, message: str = ""):
         """Update progress"""
@@ -67,13 +107,21 @@ class AnarQQInstaller:
             self.progress_callback(value, message)
     
     def check_command(self, command: str) -> Tuple[bool, str]:
-        """Check if a command is available"""
+        """Check if a command is available (successful lookups are cached)"""
+        if command in self._cmd_cache:
+            return self._cmd_cache[command]
+        
         try:
             result = subprocess.run([command, '--version'], 
                                   capture_output=True, text=True, timeout=10)
-            return result.returncode == 0, result.stdout.strip()
+            status = (result.returncode == 0, result.stdout.strip())
         except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False, ""
+            status = (False, "")
+        
+        # Don't cache failures, the user may install the tool and retry
+        if status[0]:
+            self._cmd_cache[command] = status
+        return status
     
     def check_system_requirements(self) -> bool:
         """Check system requirements"""
@@ -84,8 +132,13 @@ class AnarQQInstaller:
         python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
         self.log(f"Python version: {python_version}")
         
+        # Probe all commands in parallel (each one is a subprocess)
+        commands = ('node', 'npm', 'git', 'docker')
+        with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+            results = dict(zip(commands, executor.map(self.check_command, commands)))
+        
         # Check Node.js
-        node_available, node_version = self.check_command('node')
+        node_available, node_version = results['node']
         if node_available:
             self.log(f"✅ Node.js found: {node_version}")
         else:
@@ -93,7 +146,7 @@ class AnarQQInstaller:
             errors += 1
         
         # Check npm
-        npm_available, npm_version = self.check_command('npm')
+        npm_available, npm_version = results['npm']
         if npm_available:
             self.log(f"✅ npm found: {npm_version}")
         else:
@@ -101,23 +154,29 @@ class AnarQQInstaller:
             errors += 1
         
         # Check Git
-        git_available, git_version = self.check_command('git')
+        git_available, git_version = results['git']
         if git_available:
             self.log(f"✅ Git found: {git_version}")
         else:
             self.log("⚠️ Git not found (will use ZIP download)", 'WARNING')
         
         # Check Docker (optional)
-        docker_available, docker_version = self.check_command('docker')
+        docker_available, docker_version = results['docker']
         if docker_available:
             self.log(f"✅ Docker found: {docker_version}")
         else:
             self.log("ℹ️ Docker not found (optional)", 'INFO')
         
-        # Check disk space
+        # Check disk space on the filesystem that will hold the installation
         try:
-            disk_usage = shutil.disk_usage(Path.home())
-            available_gb = disk_usage.free / (1024**3)
+            target = self.install_dir.parent
+            while not target.exists() and target != target.parent:
+                target = target.parent
+            if hasattr(os, 'statvfs'):
+                st = os.statvfs(target)
+                available_gb = st.f_bavail * st.f_frsize / (1024**3)
+            else:  # Windows
+                available_gb = shutil.disk_usage(target).free / (1024**3)
             if available_gb >= CONFIG['required_disk_gb']:
                 self.log(f"✅ Disk space: {available_gb:.1f}GB available")
             else:
@@ -141,24 +200,79 @@ class AnarQQInstaller:
         
         self.log(f"✅ Directories created at: {self.install_dir}")
     
-    def download_file(self, url: str, destination: Path, description: str = ""):
-        """Download a file with progress"""
+    def download_file(self, url: str, description: str = "") -> BinaryIO:
+        """Download a file with progress, in memory when small, else to a temp file"""
         self.log(f"Downloading {description or url}...")
         
-        def progress_hook(block_num, block_size, total_size):
-            if total_size > 0:
-                percent = min(100, (block_num * block_size * 100) // total_size)
-                self.update_progress(percent, f"Downloading {description}... {percent}%")
-        
-        urllib.request.urlretrieve(url, destination, progress_hook)
-        self.log(f"✅ Downloaded: {destination}")
+        chunk = bytearray(COPY_BUFFER_SIZE)
+        view = memoryview(chunk)
+        with self._http.open(url) as response:
+            total_size = int(response.headers.get('Content-Length') or 0)
+            if 0 < total_size <= MAX_IN_MEMORY_DOWNLOAD:
+                buffer = io.BytesIO()
+            else:
+                buffer = tempfile.TemporaryFile()
+            downloaded = 0
+            next_report = PROGRESS_INTERVAL
+            while True:
+                n = response.readinto(chunk)
+                if not n:
+                    break
+                buffer.write(view[:n])
+                downloaded += n
+                
+                # Throttle progress updates to one per PROGRESS_INTERVAL bytes
+                if total_size > 0 and downloaded >= next_report:
+                    percent = min(100, (downloaded * 100) // total_size)
+                    self.update_progress(percent, f"Downloading {description}... {percent}%")
+                    next_report = downloaded + PROGRESS_INTERVAL
+        
+        if total_size > 0:
+            self.update_progress(100, f"Downloading {description}... 100%")
+        
+        buffer.seek(0)
+        self.log(f"✅ Downloaded: {description or url} ({downloaded} bytes)")
+        return buffer
     
-    def extract_zip(self, zip_path: Path, extract_to: Path, description: str = ""):
-        """Extract a ZIP file"""
-        self.log(f"Extracting {description or zip_path.name}...")
-        
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_to)
+    def extract_zip(self, zip_file: Union[Path, BinaryIO], extract_to: Path, description: str = ""):
+        """Extract a ZIP file (files are never flushed or fsynced individually)"""
+        self.log(f"Extracting {description or 'archive'}...")
+        
+        # Directories already created, to avoid repeated mkdir/stat calls
+        created_dirs = set()
+        
+        # Resolve the extraction root once; entries are checked with string ops
+        root_dir = os.path.realpath(extract_to)
+        root_prefix = root_dir + os.sep
+        
+        def ensure_dir(path: Path):
+            if path not in created_dirs:
+                path.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(path)
+        
+        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                # Reject entries escaping the extraction root (path traversal)
+                dest = os.path.normpath(os.path.join(root_dir, info.filename))
+                if not (dest + os.sep).startswith(root_prefix):
+                    raise ValueError(f"Unsafe path in archive: {info.filename}")
+                target = Path(dest)
+                if info.is_dir():
+                    ensure_dir(target)
+                    continue
+                
+                # Stream each entry to disk with large buffers
+                ensure_dir(target.parent)
+                with zip_ref.open(info) as src, open(target, 'wb', buffering=COPY_BUFFER_SIZE) as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                
+                # Preserve the executable bit of regular files (entries without
+                # a file type are plain files too); the new file's permissions
+                # already honour the umask, so only add exec bits
+                mode = info.external_attr >> 16
+                if stat.S_IFMT(mode) in (0, stat.S_IFREG) and mode & 0o111:
+                    current = os.stat(target).st_mode
+                    os.chmod(target, current | ((current & 0o444) >> 2))
         
         self.log(f"✅ Extracted to: {extract_to}")
     
@@ -169,53 +283,92 @@ class AnarQQInstaller:
         if git_available:
             try:
                 self.log(f"Cloning {name} repository...")
-                if destination.exists() and (destination / '.git').exists():
-                    # Update existing repository
-                    subprocess.run(['git', 'pull', 'origin', 'main'], 
-                                 cwd=destination, check=True, capture_output=True)
+                if os.path.exists(os.path.join(str(destination), '.git')):
+                    # Update existing repository (fetches only commits past the shallow tip)
+                    subprocess.run(['git', 'pull', '--ff-only', 'origin', 'main'], 
+                                 cwd=destination, check=True, text=True,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
                     self.log(f"✅ Updated {name} repository")
                 else:
-                    # Clone new repository
-                    subprocess.run(['git', 'clone', repo_url, str(destination)], 
-                                 check=True, capture_output=True)
+                    # Clone new repository (shallow, main branch only)
+                    subprocess.run(['git', 'clone', '--depth=1', '--single-branch', '--branch=main',
+                                  repo_url, str(destination)], 
+                                 check=True, text=True,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
                     self.log(f"✅ Cloned {name} repository")
                 return
             except subprocess.CalledProcessError as e:
-                self.log(f"⚠️ Git clone failed: {e}", 'WARNING')
+                self.log(f"⚠️ Git clone failed: {e} {(e.stderr or '').strip()}", 'WARNING')
         
-        # Fallback to ZIP download
+        # Fallback to ZIP download (in memory when small, see download_file)
         self.log(f"Downloading {name} as ZIP...")
-        with tempfile.TemporaryDirectory() as temp_dir:
-            zip_path = Path(temp_dir) / f"{name}.zip"
-            self.download_file(zip_url, zip_path, f"{name} repository")
-            
-            # Extract ZIP
-            extract_path = Path(temp_dir) / 'extracted'
-            self.extract_zip(zip_path, extract_path, f"{name} repository")
+        archive = self.download_file(zip_url, f"{name} repository")
+        
+        # Extract ZIP next to the destination
+        extract_path = destination.parent / f".{destination.name}-extract"
+        if extract_path.exists():
+            shutil.rmtree(extract_path)
+        try:
+            self.extract_zip(archive, extract_path, f"{name} repository")
             
-            # Move contents to destination
-            extracted_dirs = list(extract_path.iterdir())
-            if extracted_dirs:
-                source_dir = extracted_dirs[0]  # Usually the first directory
+            # Rename contents into place (same filesystem, no copy)
+            with os.scandir(extract_path) as entries:
+                source_dir = next((entry.path for entry in entries if entry.is_dir()), None)
+            if source_dir:
+                old_dir = destination.with_name(destination.name + '.old')
+                if old_dir.exists():
+                    # Leftover from an interrupted background cleanup
+                    shutil.rmtree(old_dir)
                 if destination.exists():
-                    shutil.rmtree(destination)
-                shutil.move(str(source_dir), str(destination))
+                    os.rename(destination, old_dir)
+                try:
+                    os.rename(source_dir, destination)
+                except OSError:
+                    # Put the previous tree back rather than stranding it
+                    if old_dir.exists():
+                        os.rename(old_dir, destination)
+                    raise
+                
+                # Remove the previous tree in the background, joined at the end of install()
+                if old_dir.exists():
+                    cleanup = threading.Thread(target=shutil.rmtree, args=(old_dir,),
+                                               kwargs={'ignore_errors': True}, daemon=True)
+                    cleanup.start()
+                    self._cleanup_threads.append(cleanup)
                 self.log(f"✅ Downloaded and extracted {name}")
+        finally:
+            archive.close()
+            shutil.rmtree(extract_path, ignore_errors=True)
     
     def install_dependencies(self, directory: Path, name: str):
         """Install npm dependencies"""
         self.log(f"Installing {name} dependencies...")
         
+        # Skip update checks and tty progress rendering
+        npm_env = {**os.environ, 'NPM_CONFIG_UPDATE_NOTIFIER': 'false', 'NPM_CONFIG_PROGRESS': 'false'}
+        
+        # Use the lockfile as-is when available (no dependency resolution)
+        if os.path.isfile(os.path.join(str(directory), 'package-lock.json')):
+            install_cmd = ['npm', 'ci', '--prefer-offline', '--no-audit', '--no-fund']
+        else:
+            install_cmd = ['npm', 'install', '--prefer-offline', '--no-audit', '--no-fund']
+        
         try:
-            # Install dependencies
-            subprocess.run(['npm', 'install'], cwd=directory, check=True, 
-                         capture_output=True, text=True)
+            # Install dependencies, streaming output to the log line by line
+            with subprocess.Popen(install_cmd, cwd=directory, env=npm_env, text=True, bufsize=1,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+                for line in process.stdout:
+                    line = line.rstrip()
+                    if line:
+                        self.log(f"{name} npm: {line}")
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, install_cmd)
             self.log(f"✅ {name} dependencies installed")
             
             # Try to build
             try:
-                subprocess.run(['npm', 'run', 'build'], cwd=directory, check=True, 
-                             capture_output=True, text=True)
+                subprocess.run(['npm', 'run', 'build'], cwd=directory, check=True, env=npm_env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 self.log(f"✅ {name} built successfully")
             except subprocess.CalledProcessError:
                 self.log(f"⚠️ {name} build failed (not critical)", 'WARNING')
@@ -229,10 +382,11 @@ class AnarQQInstaller:
         self.log("Setting up environment...")
         
         # Copy .env.example to .env in demo directory
-        env_example = self.demo_dir / '.env.example'
-        env_file = self.demo_dir / '.env'
+        demo_dir = str(self.demo_dir)
+        env_example = os.path.join(demo_dir, '.env.example')
+        env_file = os.path.join(demo_dir, '.env')
         
-        if env_example.exists() and not env_file.exists():
+        if os.path.isfile(env_example) and not os.path.lexists(env_file):
             shutil.copy2(env_example, env_file)
             self.log("✅ Environment file created")
     
@@ -244,42 +398,46 @@ class AnarQQInstaller:
         if os.name == 'nt':  # Windows
             # Start demo script
             start_script = self.install_dir / 'start-demo.bat'
-            with open(start_script, 'w') as f:
-                f.write('@echo off\n')
-                f.write('echo 🚀 Starting AnarQ&Q Demo...\n')
-                f.write(f'cd /d "{self.demo_dir}"\n')
-                f.write('npm run dev\n')
-                f.write('pause\n')
+            start_script.write_text(
+                '@echo off\n'
+                'echo 🚀 Starting AnarQ&Q Demo...\n'
+                f'cd /d "{self.demo_dir}"\n'
+                'npm run dev\n'
+                'pause\n'
+            )
             
             # Stop script
             stop_script = self.install_dir / 'stop-services.bat'
-            with open(stop_script, 'w') as f:
-                f.write('@echo off\n')
-                f.write('echo 🛑 Stopping AnarQ&Q services...\n')
-                f.write(f'cd /d "{self.demo_dir}"\n')
-                f.write('if exist "docker-compose.yml" docker-compose down\n')
-                f.write('echo Services stopped\n')
-                f.write('pause\n')
+            stop_script.write_text(
+                '@echo off\n'
+                'echo 🛑 Stopping AnarQ&Q services...\n'
+                f'cd /d "{self.demo_dir}"\n'
+                'if exist "docker-compose.yml" docker-compose down\n'
+                'echo Services stopped\n'
+                'pause\n'
+            )
         else:  # Unix-like
             # Start demo script
             start_script = self.install_dir / 'start-demo.sh'
-            with open(start_script, 'w') as f:
-                f.write('#!/bin/bash\n')
-                f.write('echo "🚀 Starting AnarQ&Q Demo..."\n')
-                f.write(f'cd "{self.demo_dir}"\n')
-                f.write('npm run dev\n')
+            start_script.write_text(
+                '#!/bin/bash\n'
+                'echo "🚀 Starting AnarQ&Q Demo..."\n'
+                f'cd "{self.demo_dir}"\n'
+                'npm run dev\n'
+            )
             start_script.chmod(0o755)
             
             # Stop script
             stop_script = self.install_dir / 'stop-services.sh'
-            with open(stop_script, 'w') as f:
-                f.write('#!/bin/bash\n')
-                f.write('echo "🛑 Stopping AnarQ&Q services..."\n')
-                f.write(f'cd "{self.demo_dir}"\n')
-                f.write('if [ -f "docker-compose.yml" ]; then\n')
-                f.write('    docker-compose down\n')
-                f.write('fi\n')
-                f.write('echo "Services stopped"\n')
+            stop_script.write_text(
+                '#!/bin/bash\n'
+                'echo "🛑 Stopping AnarQ&Q services..."\n'
+                f'cd "{self.demo_dir}"\n'
+                'if [ -f "docker-compose.yml" ]; then\n'
+                '    docker-compose down\n'
+                'fi\n'
+                'echo "Services stopped"\n'
+            )
             stop_script.chmod(0o755)
         
         self.log("✅ Launcher scripts created")
@@ -299,25 +457,33 @@ class AnarQQInstaller:
             self.setup_directories()
             self.update_progress(20, "Directories created")
             
-            # Download demo repository
-            self.clone_or_download_repo(
-                CONFIG['demo_repo'], 
-                CONFIG['demo_zip'], 
-                self.demo_dir, 
-                'Demo'
-            )
-            self.update_progress(40, "Demo repository downloaded")
+            # Download demo and core repositories in parallel (network-bound)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(
+                    self.clone_or_download_repo,
+                    CONFIG['demo_repo'], 
+                    CONFIG['demo_zip'], 
+                    self.demo_dir, 
+                    'Demo'
+                )]
+                
+                # Download core repository if requested
+                if install_core:
+                    futures.append(executor.submit(
+                        self.clone_or_download_repo,
+                        CONFIG['core_repo'], 
+                        CONFIG['core_zip'], 
+                        self.core_dir, 
+                        'Core'
+                    ))
+                
+                for future in futures:
+                    future.result()
             
-            # Download core repository if requested
             if install_core:
-                self.clone_or_download_repo(
-                    CONFIG['core_repo'], 
-                    CONFIG['core_zip'], 
-                    self.core_dir, 
-                    'Core'
-                )
-                self.update_progress(60, "Core repository downloaded")
+                self.update_progress(60, "Demo and core repositories downloaded")
             else:
+                self.update_progress(40, "Demo repository downloaded")
                 self.update_progress(60, "Skipping core repository")
             
             # Install demo dependencies
@@ -338,25 +504,49 @@ class AnarQQInstaller:
         except Exception as e:
             self.log(f"❌ Installation failed: {e}", 'ERROR')
             return False
+        
+        finally:
+            # Make sure replaced trees are gone before returning
+            for cleanup in self._cleanup_threads:
+                cleanup.join()
+            self._cleanup_threads.clear()
 
 class InstallerGUI:
     def __init__(self):
+        # Imported here so console runs never load Tcl/Tk (raises ImportError if missing)
+        import tkinter as tk
+        from tkinter import ttk, messagebox, filedialog, scrolledtext
+        self.tk = tk
+        self.ttk = ttk
+        self.messagebox = messagebox
+        self.filedialog = filedialog
+        self.scrolledtext = scrolledtext
+        
         self.installer = AnarQQInstaller()
         self.installer.progress_callback = self.update_progress
         self.installer.log_callback = self.add_log
         
-        self.root = tk.Tk()
+        self.root = self.tk.Tk()
         self.root.title("AnarQ&Q Ecosystem Demo Installer")
         self.root.geometry("800x600")
         self.root.resizable(True, True)
         
+        # Log messages not yet shown, flushed together by the main loop
+        self._pending_logs = []
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        
+        # Installation worker, None when no installation is running
+        self._install_thread = None
+        
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
     
     def setup_ui(self):
         """Setup the user interface"""
         # Main frame
-        main_frame = ttk.Frame(self.root, padding="10")
-        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        main_frame = self.ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(self.tk.W, self.tk.E, self.tk.N, self.tk.S))
         
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
@@ -365,109 +555,151 @@ class InstallerGUI:
         main_frame.rowconfigure(4, weight=1)
         
         # Title
-        title_label = ttk.Label(main_frame, text="🚀 AnarQ&Q Ecosystem Demo Installer", 
+        title_label = self.ttk.Label(main_frame, text="🚀 AnarQ&Q Ecosystem Demo Installer", 
                                font=('Arial', 16, 'bold'))
         title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
         
         # Installation directory
-        ttk.Label(main_frame, text="Installation Directory:").grid(row=1, column=0, sticky=tk.W)
-        self.install_dir_var = tk.StringVar(value=str(self.installer.install_dir))
-        dir_entry = ttk.Entry(main_frame, textvariable=self.install_dir_var, width=50)
-        dir_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(5, 5))
+        self.ttk.Label(main_frame, text="Installation Directory:").grid(row=1, column=0, sticky=self.tk.W)
+        self.install_dir_var = self.tk.StringVar(value=str(self.installer.install_dir))
+        self.dir_entry = self.ttk.Entry(main_frame, textvariable=self.install_dir_var, width=50)
+        self.dir_entry.grid(row=1, column=1, sticky=(self.tk.W, self.tk.E), padx=(5, 5))
         
-        browse_btn = ttk.Button(main_frame, text="Browse", command=self.browse_directory)
-        browse_btn.grid(row=1, column=2, padx=(5, 0))
+        self.browse_btn = self.ttk.Button(main_frame, text="Browse", command=self.browse_directory)
+        self.browse_btn.grid(row=1, column=2, padx=(5, 0))
         
         # Options
-        options_frame = ttk.LabelFrame(main_frame, text="Installation Options", padding="10")
-        options_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        options_frame = self.ttk.LabelFrame(main_frame, text="Installation Options", padding="10")
+        options_frame.grid(row=2, column=0, columnspan=3, sticky=(self.tk.W, self.tk.E), pady=(10, 0))
         
-        self.install_core_var = tk.BooleanVar()
-        core_check = ttk.Checkbutton(options_frame, text="Install complete ecosystem (core repository)", 
+        self.install_core_var = self.tk.BooleanVar()
+        core_check = self.ttk.Checkbutton(options_frame, text="Install complete ecosystem (core repository)", 
                                     variable=self.install_core_var)
-        core_check.grid(row=0, column=0, sticky=tk.W)
+        core_check.grid(row=0, column=0, sticky=self.tk.W)
         
         # Progress
-        progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding="10")
-        progress_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        progress_frame = self.ttk.LabelFrame(main_frame, text="Progress", padding="10")
+        progress_frame.grid(row=3, column=0, columnspan=3, sticky=(self.tk.W, self.tk.E), pady=(10, 0))
         progress_frame.columnconfigure(0, weight=1)
         
-        self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
-        self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        self.progress_var = self.tk.DoubleVar()
+        self.progress_bar = self.ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.grid(row=0, column=0, sticky=(self.tk.W, self.tk.E), pady=(0, 5))
         
-        self.progress_label = ttk.Label(progress_frame, text="Ready to install")
-        self.progress_label.grid(row=1, column=0, sticky=tk.W)
+        self.progress_label = self.ttk.Label(progress_frame, text="Ready to install")
+        self.progress_label.grid(row=1, column=0, sticky=self.tk.W)
         
         # Log
-        log_frame = ttk.LabelFrame(main_frame, text="Installation Log", padding="10")
-        log_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        log_frame = self.ttk.LabelFrame(main_frame, text="Installation Log", padding="10")
+        log_frame.grid(row=4, column=0, columnspan=3, sticky=(self.tk.W, self.tk.E, self.tk.N, self.tk.S), pady=(10, 0))
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
         
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=80)
-        self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.log_text = self.scrolledtext.ScrolledText(log_frame, height=15, width=80)
+        self.log_text.grid(row=0, column=0, sticky=(self.tk.W, self.tk.E, self.tk.N, self.tk.S))
         
         # Buttons
-        button_frame = ttk.Frame(main_frame)
+        button_frame = self.ttk.Frame(main_frame)
         button_frame.grid(row=5, column=0, columnspan=3, pady=(10, 0))
         
-        self.install_btn = ttk.Button(button_frame, text="Install", command=self.start_installation)
-        self.install_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.install_btn = self.ttk.Button(button_frame, text="Install", command=self.start_installation)
+        self.install_btn.pack(side=self.tk.LEFT, padx=(0, 10))
         
-        self.close_btn = ttk.Button(button_frame, text="Close", command=self.root.quit)
-        self.close_btn.pack(side=tk.LEFT)
+        self.close_btn = self.ttk.Button(button_frame, text="Close", command=self.close)
+        self.close_btn.pack(side=self.tk.LEFT)
     
     def browse_directory(self):
         """Browse for installation directory"""
-        directory = filedialog.askdirectory(initialdir=self.install_dir_var.get())
+        directory = self.filedialog.askdirectory(initialdir=self.install_dir_var.get())
         if directory:
+            # Installer paths are applied when the installation starts
             self.install_dir_var.set(directory)
-            self.installer.install_dir = Path(directory)
-            self.installer.demo_dir = self.installer.install_dir / 'demo'
-            self.installer.core_dir = self.installer.install_dir / 'core'
-            self.installer.log_file = self.installer.install_dir / 'install.log'
+    
+    def close(self):
+        """Close the installer, refused while an installation is running"""
+        if self._install_thread and self._install_thread.is_alive():
+            self.messagebox.showwarning("Installation in progress",
+                "Please wait for the installation to finish before closing the installer.")
+            return
+        self.root.quit()
     
     def update_progress(self, value: int, message: str = ""):
-        """Update progress bar and label"""
+        """Update progress bar and label (safe to call from any thread)"""
+        self.root.after(0, self._set_progress, value, message)
+    
+    def _set_progress(self, value: int, message: str):
         self.progress_var.set(value)
         if message:
             self.progress_label.config(text=message)
-        self.root.update_idletasks()
     
     def add_log(self, message: str):
-        """Add message to log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        """Add message to log (safe to call from any thread)"""
+        with self._pending_lock:
+            self._pending_logs.append(message)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.root.after(GUI_REFRESH_INTERVAL_MS, self._flush_logs)
+    
+    def _flush_logs(self):
+        """Insert pending log messages in a single widget update"""
+        with self._pending_lock:
+            messages = self._pending_logs
+            self._pending_logs = []
+            self._flush_scheduled = False
+        
+        if messages:
+            self.log_text.insert(self.tk.END, "\n".join(messages) + "\n")
+            self.log_text.see(self.tk.END)
+    
+    def set_inputs_state(self, state: str):
+        """Enable or disable the inputs that must not change during installation"""
+        for widget in (self.install_btn, self.browse_btn, self.dir_entry, self.close_btn):
+            widget.config(state=state)
     
     def start_installation(self):
         """Start the installation process"""
-        self.install_btn.config(state='disabled')
-        
+        self.set_inputs_state('disabled')
+        
+        # Update installer paths (only changed here, never while the worker runs)
+        self.installer.install_dir = Path(self.install_dir_var.get())
+        self.installer.demo_dir = self.installer.install_dir / 'demo'
+        self.installer.core_dir = self.installer.install_dir / 'core'
+        self.installer.log_file = self.installer.install_dir / 'install.log'
+        
+        # Run installation on a worker thread so the main loop keeps redrawing
+        self._install_thread = threading.Thread(
+            target=self._run_install, args=(self.install_core_var.get(),), daemon=True
+        )
+        self._install_thread.start()
+    
+    def _run_install(self, install_core: bool):
+        """Installation worker, reports the result back to the main thread"""
         try:
-            # Update installer paths
-            self.installer.install_dir = Path(self.install_dir_var.get())
-            self.installer.demo_dir = self.installer.install_dir / 'demo'
-            self.installer.core_dir = self.installer.install_dir / 'core'
-            self.installer.log_file = self.installer.install_dir / 'install.log'
-            
-            # Start installation
-            success = self.installer.install(self.install_core_var.get())
-            
-            if success:
-                messagebox.showinfo("Success", 
-                    f"Installation completed successfully!\n\n"
-                    f"Installation directory: {self.installer.install_dir}\n\n"
-                    f"Use the launcher scripts to start the demo.")
-            else:
-                messagebox.showerror("Error", "Installation failed. Check the log for details.")
-                
+            success = self.installer.install(install_core)
+            error = None
         except Exception as e:
-            messagebox.showerror("Error", f"Installation failed: {e}")
+            success = False
+            error = e
         
-        finally:
-            self.install_btn.config(state='normal')
+        self.root.after(0, self._finish_installation, success, error)
+    
+    def _finish_installation(self, success: bool, error: Optional[Exception]):
+        """Show the installation result"""
+        self._install_thread = None
+        self._flush_logs()
+        
+        if error:
+            self.messagebox.showerror("Error", f"Installation failed: {error}")
+        elif success:
+            self.messagebox.showinfo("Success", 
+                f"Installation completed successfully!\n\n"
+                f"Installation directory: {self.installer.install_dir}\n\n"
+                f"Use the launcher scripts to start the demo.")
+        else:
+            self.messagebox.showerror("Error", "Installation failed. Check the log for details.")
+        
+        self.set_inputs_state('normal')
     
     def run(self):
         """Run the GUI"""
@@ -516,16 +748,16 @@ def main():
         # Force console mode
         return console_install()
     
-    if GUI_AVAILABLE:
-        try:
-            app = InstallerGUI()
-            app.run()
-            return True
-        except Exception as e:
-            print(f"GUI failed: {e}")
-            print("Falling back to console mode...")
-            return console_install()
-    else:
+    try:
+        app = InstallerGUI()
+        app.run()
+        return True
+    except ImportError:
+        print("GUI not available, running in console mode")
+        return console_install()
+    except Exception as e:
+        print(f"GUI failed: {e}")
+        print("Falling back to console mode...")
         return console_install()
 
 if __name__ == "__main__":